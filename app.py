@@ -1,140 +1,334 @@
 from flask import Flask, render_template, request, jsonify
-import copy
+from flask.json.provider import DefaultJSONProvider
+import functools
 import logging
+import operator
+import platform
 import uuid
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+import solver_kernels as kernels
+import optimal
+import twophase
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Encodes and decodes JSON with orjson, keeping Flask's response handling."""
+
+    def dumps(self, obj, **kwargs):
+        # orjson is always compact, and only indents by two spaces, which is
+        # what Flask asks for when it pretty-prints.
+        option = 0
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+# orjson is optional; without it Flask keeps its stdlib json provider.
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # --- CUBE SIMULATION LOGIC ---
 
+# Sticker colors the frontend can send.
+VALID_COLORS = ['W', 'R', 'G', 'Y', 'O', 'B']
+
 def validate_cube(cube):
-    """Validates the cube state to ensure it has correct format and colors."""
-    valid_faces = {'U', 'D', 'F', 'B', 'L', 'R'}
-    if not isinstance(cube, dict) or set(cube.keys()) != valid_faces:
-        raise ValueError("Cube must have exactly U, D, F, B, L, R faces")
-    
-    colors = set()
-    for face in cube:
-        if not isinstance(cube[face], list) or len(cube[face]) != 3:
-            raise ValueError(f"Face {face} must be a 3x3 matrix")
-        for row in cube[face]:
-            if not isinstance(row, list) or len(row) != 3:
-                raise ValueError(f"Face {face} rows must contain 3 stickers")
-            colors.update(row)
+    """Validates a cube sent as 54 color codes: six colors, nine stickers each."""
+    try:
+        stickers = np.asarray(cube)
+    except ValueError:
+        stickers = None
+    if stickers is None or stickers.shape != (54,):
+        raise ValueError("Cube must be a list of 54 sticker colors")
+    if not np.isin(stickers, VALID_COLORS).all():
+        raise ValueError(f"Sticker colors must be one of {', '.join(VALID_COLORS)}")
     
-    if len(colors) > 6:
-        raise ValueError("Cube contains more than 6 distinct colors")
+    colors, counts = np.unique(stickers, return_counts=True)
+    if len(colors) != 6 or (counts != 9).any():
+        raise ValueError("Each of the 6 colors must appear exactly 9 times")
+    if len(np.unique(stickers[4::9])) != 6:
+        raise ValueError("Each face center must have a different color")
     
     return True
 
-def rotate_face(face):
-    """Clockwise 90-degree rotation of a 3x3 face."""
-    return [list(row) for row in zip(*face[::-1])]
+# Flat facelet layout: 54 stickers, face by face in FACES order, each face
+# row-major. A sticker is stored as the index of the face whose center
+# shares its color.
+FACES = 'URFDLB'
+FACE_OFFSETS = {'U': 0, 'R': 9, 'F': 18, 'D': 27, 'L': 36, 'B': 45}
 
-def apply_move(cube, move):
-    """Applies a single move to the cube state."""
-    if not move or move[0] not in 'UDFBLR':
-        raise ValueError(f"Invalid move: {move}")
-    
-    face_char = move[0]
-    suffix = move[1:] if len(move) > 1 else ''
-    if suffix not in ['', "'", '2']:
-        raise ValueError(f"Invalid move suffix: {suffix}")
+def facelet(face, row, col):
+    """Index of a face's (row, col) sticker in the flat cube."""
+    return FACE_OFFSETS[face] + 3 * row + col
+
+def _flatten(cube):
+    """Lists the stickers of a face dict in flat facelet order."""
+    return [cube[face][row][col] for face in FACES for row in range(3) for col in range(3)]
+
+def stickers_to_flat(stickers):
+    """Converts 54 color codes in flat facelet order into a flat uint8 cube."""
+    stickers = np.asarray(stickers)
+    centers = stickers[4::9]
+    order = np.argsort(centers)
+    codes = order[np.searchsorted(centers, stickers, sorter=order).clip(max=5)]
+    if (centers[codes] != stickers).any():
+        raise ValueError("Every sticker color must match one of the face centers")
+    return codes.astype(np.uint8)
+
+def flat_to_dict(flat, colors):
+    """Converts a flat cube back into a face dict, decoding stickers via colors."""
+    return {
+        face: [[colors[flat[facelet(face, row, col)]] for col in range(3)] for row in range(3)]
+        for face in FACES
+    }
+
+def _turn_face(cube, face_char):
+    """Turns one face of a face dict a quarter turn clockwise, in place."""
+    cube[face_char] = np.rot90(cube[face_char], -1).tolist()
     
-    turns = 3 if "'" in suffix else (2 if "2" in suffix else 1)
-    cube = copy.deepcopy(cube)
+    U, D, F, B, L, R = 'U', 'D', 'F', 'B', 'L', 'R'
     
-    for _ in range(turns):
-        cube[face_char] = rotate_face(cube[face_char])
-        
-        U, D, F, B, L, R = 'U', 'D', 'F', 'B', 'L', 'R'
-        
-        if face_char == U:
-            tmp = cube[F][0][:]
-            cube[F][0] = cube[R][0][:]
-            cube[R][0] = cube[B][0][:]
-            cube[B][0] = cube[L][0][:]
-            cube[L][0] = tmp
-        elif face_char == D:
-            tmp = cube[F][2][:]
-            cube[F][2] = cube[L][2][:]
-            cube[L][2] = cube[B][2][:]
-            cube[B][2] = cube[R][2][:]
-            cube[R][2] = tmp
-        elif face_char == F:
-            tmp = [cube[U][2][i] for i in range(3)]
-            for i in range(3):
-                cube[U][2][i]   = cube[L][2-i][2]
-                cube[L][2-i][2] = cube[D][0][2-i]
-                cube[D][0][2-i] = cube[R][i][0]
-                cube[R][i][0]   = tmp[i]
-        elif face_char == B:
-            tmp = [cube[U][0][i] for i in range(3)]
-            for i in range(3):
-                cube[U][0][i]   = cube[R][i][2]
-                cube[R][i][2]   = cube[D][2][2-i]
-                cube[D][2][2-i] = cube[L][2-i][0]
-                cube[L][2-i][0] = tmp[i]
-        elif face_char == L:
-            tmp = [cube[U][i][0] for i in range(3)]
-            for i in range(3):
-                cube[U][i][0]   = cube[B][2-i][2]
-                cube[B][2-i][2] = cube[D][i][0]
-                cube[D][i][0]   = cube[F][i][0]
-                cube[F][i][0]   = tmp[i]
-        elif face_char == R:
-            tmp = [cube[U][i][2] for i in range(3)]
-            for i in range(3):
-                cube[U][i][2]   = cube[F][i][2]
-                cube[F][i][2]   = cube[D][i][2]
-                cube[D][i][2]   = cube[B][2-i][0]
-                cube[B][2-i][0] = tmp[i]
-    return cube
+    if face_char == U:
+        tmp = cube[F][0][:]
+        cube[F][0] = cube[R][0][:]
+        cube[R][0] = cube[B][0][:]
+        cube[B][0] = cube[L][0][:]
+        cube[L][0] = tmp
+    elif face_char == D:
+        tmp = cube[F][2][:]
+        cube[F][2] = cube[L][2][:]
+        cube[L][2] = cube[B][2][:]
+        cube[B][2] = cube[R][2][:]
+        cube[R][2] = tmp
+    elif face_char == F:
+        tmp = [cube[U][2][i] for i in range(3)]
+        for i in range(3):
+            cube[U][2][i]   = cube[L][2-i][2]
+            cube[L][2-i][2] = cube[D][0][2-i]
+            cube[D][0][2-i] = cube[R][i][0]
+            cube[R][i][0]   = tmp[i]
+    elif face_char == B:
+        tmp = [cube[U][0][i] for i in range(3)]
+        for i in range(3):
+            cube[U][0][i]   = cube[R][i][2]
+            cube[R][i][2]   = cube[D][2][2-i]
+            cube[D][2][2-i] = cube[L][2-i][0]
+            cube[L][2-i][0] = tmp[i]
+    elif face_char == L:
+        tmp = [cube[U][i][0] for i in range(3)]
+        for i in range(3):
+            cube[U][i][0]   = cube[B][2-i][2]
+            cube[B][2-i][2] = cube[D][i][0]
+            cube[D][i][0]   = cube[F][i][0]
+            cube[F][i][0]   = tmp[i]
+    elif face_char == R:
+        tmp = [cube[U][i][2] for i in range(3)]
+        for i in range(3):
+            cube[U][i][2]   = cube[F][i][2]
+            cube[F][i][2]   = cube[D][i][2]
+            cube[D][i][2]   = cube[B][2-i][0]
+            cube[B][2-i][0] = tmp[i]
+
+# Quarter turns per move and the suffix naming each turn count.
+TURNS_TO_SUFFIX = {1: '', 2: '2', 3: "'"}
+MOVE_TURNS = {face + suffix: turns for face in 'UDFBLR' for turns, suffix in TURNS_TO_SUFFIX.items()}
+OPPOSITE = {'U': 'D', 'D': 'U', 'L': 'R', 'R': 'L', 'F': 'B', 'B': 'F'}
+
+def _build_perms():
+    """Builds a gather permutation for each of the 18 moves.
+
+    Each face is turned symbolically on a cube whose stickers are their own
+    flat indices, so afterwards every sticker names the index it came from.
+    """
+    perms = {}
+    for face_char in 'UDFBLR':
+        cube = flat_to_dict(np.arange(54), range(54))
+        for suffix in TURNS_TO_SUFFIX.values():
+            _turn_face(cube, face_char)
+            perms[face_char + suffix] = np.array(_flatten(cube), dtype=np.intp)
+    return perms
+
+PERMS = _build_perms()
 
 def is_cube_solved(cube):
-    """Checks if the cube is solved."""
-    for face in 'UDFBLR':
-        center_color = cube[face][1][1]
-        for row in cube[face]:
-            if any(sticker != center_color for sticker in row):
-                return False
-    return True
+    """Checks if every face of a flat cube matches its center."""
+    return bool(kernels.is_solved(cube))
+
+# Packed form: every color code fits in 3 bits, so a cube packs into
+# 54 * 3 = 162 bits (21 bytes). Used as a compact, hashable state key.
+PACKED_BITS = 54 * 3
+
+def pack_cube(cube):
+    """Packs a flat cube into 21 bytes, 3 bits per sticker."""
+    bits = np.unpackbits(np.asarray(cube, dtype=np.uint8)[:, None], axis=1)[:, 5:]
+    return np.packbits(bits.ravel()).tobytes()
+
+def unpack_cube(packed):
+    """Restores a flat cube from its packed bytes."""
+    bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=PACKED_BITS).reshape(54, 3)
+    return (bits @ np.array([4, 2, 1], dtype=np.uint8)).astype(np.uint8)
+
+def compose(moves):
+    """Composes a move sequence into a single gather permutation."""
+    perm = np.arange(54)
+    for move in moves:
+        perm = perm[PERMS[move]]
+    return perm
+
+# Fixed algorithms the LBL stages apply as a single unit, stored as tuples
+# so they key the sequence_perm cache as they are.
+ALGS = {
+    'sexy_d': ('R', 'D', 'R\'', 'D\''),
+    'insert_right': ('U', 'R', 'U\'', 'R\'', 'U\'', 'F\'', 'U', 'F'),
+    'insert_left': ('U\'', 'L\'', 'U', 'L', 'U', 'F', 'U\'', 'F\''),
+    'oll_dot': ('F', 'R', 'U', 'R\'', 'U\'', 'F\''),
+    'oll_line': ('F', 'U', 'R', 'U\'', 'R\'', 'F\''),
+    'sune': ('R', 'U', 'R\'', 'U', 'R', 'U2', 'R\''),
+    'pll_a': ('R\'', 'F', 'R\'', 'B2', 'R', 'F\'', 'R\'', 'B2', 'R2'),
+    'pll_u': ('R2', 'U', 'R', 'U', 'R\'', 'U\'', 'R\'', 'U\'', 'R\'', 'U', 'R\''),
+}
+
+# Edge and corner slots as (face, row, col) triples for each of their stickers.
+EDGE_SLOTS = [
+    ('U', 0, 1, 'B', 0, 1), ('U', 1, 0, 'L', 0, 1),
+    ('U', 1, 2, 'R', 0, 1), ('U', 2, 1, 'F', 0, 1),
+    ('F', 1, 0, 'L', 1, 2), ('F', 1, 2, 'R', 1, 0),
+    ('F', 2, 1, 'D', 0, 1), ('B', 1, 0, 'R', 1, 2),
+    ('B', 1, 2, 'L', 1, 0), ('B', 2, 1, 'D', 2, 1),
+    ('D', 1, 0, 'L', 2, 1), ('D', 1, 2, 'R', 2, 1)
+]
+CORNER_SLOTS = [
+    ('U', 0, 0, 'L', 0, 0, 'B', 0, 2), ('U', 0, 2, 'B', 0, 0, 'R', 0, 2),
+    ('U', 2, 0, 'F', 0, 0, 'L', 0, 2), ('U', 2, 2, 'R', 0, 0, 'F', 0, 2),
+    ('D', 0, 0, 'L', 2, 2, 'F', 2, 0), ('D', 0, 2, 'F', 2, 2, 'R', 2, 0),
+    ('D', 2, 0, 'B', 2, 2, 'L', 2, 0), ('D', 2, 2, 'R', 2, 2, 'B', 2, 0)
+]
+EDGE_FACELETS = np.array([[facelet(*slot[i:i+3]) for i in range(0, 6, 3)] for slot in EDGE_SLOTS])
+CORNER_FACELETS = np.array([[facelet(*slot[i:i+3]) for i in range(0, 9, 3)] for slot in CORNER_SLOTS])
+
+# D-face edge and corner stickers checked by the last-layer stages.
+YELLOW_CROSS = operator.itemgetter(facelet('D', 0, 1), facelet('D', 1, 0), facelet('D', 1, 2), facelet('D', 2, 1))
+YELLOW_CORNERS = operator.itemgetter(facelet('D', 0, 0), facelet('D', 0, 2), facelet('D', 2, 0), facelet('D', 2, 2))
+
+def piece_key(colors):
+    """Keys a piece by the set of its colors, as a bitmask of color codes."""
+    key = 0
+    for color in colors:
+        key |= 1 << color
+    return key
+
+# Slot of each white cross edge, keyed by its side face.
+CROSS_SLOTS = {'F': 3, 'R': 2, 'B': 0, 'L': 1}
+
+def _slot_sources(perm, slot_facelets):
+    """Lists, for each slot, the slot whose piece a permutation moves into it."""
+    slots = {frozenset(stickers): i for i, stickers in enumerate(slot_facelets.tolist())}
+    return [slots[frozenset(perm[stickers].tolist())] for stickers in slot_facelets]
+
+def _slot_perm(perm, slot_facelets):
+    """Maps each slot to the slot its piece moves to under a permutation."""
+    targets = [0] * len(slot_facelets)
+    for j, i in enumerate(_slot_sources(perm, slot_facelets)):
+        targets[i] = j
+    return targets
+
+# Under PyPy the LBL solver holds its cube as a tuple of ints, because the
+# JIT handles tuple indexing far better than calls into NumPy. On CPython
+# a NumPy fancy-index gather is the faster of the two.
+TUPLE_STATE = platform.python_implementation() == 'PyPy'
+
+def _sticker_gather(perm):
+    """Turns a sticker permutation into a gather over the solver's cube state."""
+    if TUPLE_STATE:
+        return operator.itemgetter(*perm.tolist())
+    return operator.itemgetter(perm)
+
+# Every move, algorithm and literal sequence the solver applies goes
+# through here, so each is composed once and then applied as one gather.
+@functools.lru_cache(maxsize=None)
+def sequence_perm(moves):
+    """Composes a tuple of moves once into gathers for stickers, edge slots and corner slots."""
+    perm = compose(moves)
+    return (_sticker_gather(perm), operator.itemgetter(*_slot_sources(perm, EDGE_FACELETS)),
+            operator.itemgetter(*_slot_sources(perm, CORNER_FACELETS)))
+
+# Side face to the left (CCW) and right (CW) of each side face, seen from U.
+NEIGHBOR_CCW = {'F': 'L', 'R': 'F', 'B': 'R', 'L': 'B'}
+NEIGHBOR_CW = {'F': 'R', 'R': 'B', 'B': 'L', 'L': 'F'}
+
+# Where a U turn sends the piece in each edge slot.
+U_CUBIE_PERM = _slot_perm(PERMS['U'], EDGE_FACELETS)
 
 # --- IMPROVED SOLVER LOGIC (LAYER BY LAYER) ---
 class CubeSolver:
     def __init__(self, cube):
-        self.cube = copy.deepcopy(cube)
+        cube = np.array(cube, dtype=np.uint8)
+        self.cube = tuple(cube.tolist()) if TUPLE_STATE else cube
         self.solution = []
-        self.face_colors = {
-            'U': self.cube['U'][1][1],
-            'D': self.cube['D'][1][1],
-            'F': self.cube['F'][1][1],
-            'B': self.cube['B'][1][1],
-            'L': self.cube['L'][1][1],
-            'R': self.cube['R'][1][1]
-        }
+        self.face_colors = {face: int(self.cube[facelet(face, 1, 1)]) for face in 'UDFBLR'}
+        self.color_to_face = {color: face for face, color in self.face_colors.items()}
         self.max_moves = 200
         self.white_color = self.face_colors['U']
         self.yellow_color = self.face_colors['D']
+        # Key of the piece in every edge and corner slot. Moves permute these
+        # through precomputed slot gathers instead of re-reading stickers.
+        self._edge_keys = tuple(map(piece_key, cube[EDGE_FACELETS].tolist()))
+        self._corner_keys = tuple(map(piece_key, cube[CORNER_FACELETS].tolist()))
+        # Key of the piece each edge slot holds once the cube is solved.
+        self._edge_home = [piece_key(self.face_colors[slot[i]] for i in (0, 3)) for slot in EDGE_SLOTS]
 
     def _apply(self, moves):
-        """Applies a sequence of moves and logs them."""
+        """Applies a sequence of moves in one composed permutation and logs them."""
+        self._apply_perm(*sequence_perm(tuple(moves)), moves)
+
+    def _apply1(self, move):
+        """Applies a single move and logs it, without looping over a list.
+
+        Inlines _apply_perm: skipping the extra call and the one-move tuple
+        roughly halves the cost of the U and D scans.
+        """
         if len(self.solution) >= self.max_moves:
             raise Exception("Maximum moves reached. Cube might be unsolvable.")
         
-        for move in moves:
-            self.cube = apply_move(self.cube, move)
-            self.solution.append(move)
-            app.logger.debug(f"Applied move: {move}")
+        sticker_gather, edge_gather, corner_gather = sequence_perm((move,))
+        self.cube = sticker_gather(self.cube)
+        self.solution.append(move)
+        self._edge_keys = edge_gather(self._edge_keys)
+        self._corner_keys = corner_gather(self._corner_keys)
+
+    def _apply_perm(self, sticker_gather, edge_gather, corner_gather, names):
+        """Applies a precomposed permutation and logs the moves it stands for."""
+        if len(self.solution) >= self.max_moves:
+            raise Exception("Maximum moves reached. Cube might be unsolvable.")
+        
+        self.cube = sticker_gather(self.cube)
+        self.solution.extend(names)
+        self._edge_keys = edge_gather(self._edge_keys)
+        self._corner_keys = corner_gather(self._corner_keys)
+
+    def _apply_alg(self, name):
+        """Applies a fixed algorithm from ALGS in one permutation."""
+        moves = ALGS[name]
+        self._apply_perm(*sequence_perm(moves), moves)
 
     def solve(self):
         """Executes the full LBL solving sequence."""
-        if is_cube_solved(self.cube):
+        if is_cube_solved(np.asarray(self.cube, dtype=np.uint8)):
             return []
         
         try:
-            validate_cube(self.cube)
             self._solve_white_cross()
             self._solve_white_corners()
             self._solve_second_layer()
@@ -142,61 +336,55 @@ class CubeSolver:
             self._solve_yellow_face()
             self._solve_final_layer()
             
-            return self._optimize_solution()
+            optimized = self._optimize_solution()
+            app.logger.info("LBL solver applied %d moves, %d after optimization", len(self.solution), len(optimized))
+            return optimized
         except Exception as e:
             app.logger.error(f"Solver error: {e}")
             return ["Solver failed. Please reset and try again."]
 
     def _optimize_solution(self):
-        """Optimizes the solution by removing redundant moves."""
+        """Optimizes the solution by cancelling and merging turns of the same face.
+
+        Turns of opposite faces commute, so a move can also merge with the
+        one just before an opposite-face turn (R L R' becomes L). A single
+        pass over a stack reaches the fixed point: whenever the top changes,
+        the next move is checked against the new top.
+        """
         optimized = []
-        i = 0
-        n = len(self.solution)
         
-        while i < n:
-            if i < n - 1 and self.solution[i][0] == self.solution[i+1][0]:
-                move1, move2 = self.solution[i], self.solution[i+1]
-                turns1 = 1 if "'" not in move1 and "2" not in move1 else (3 if "'" in move1 else 2)
-                turns2 = 1 if "'" not in move2 and "2" not in move2 else (3 if "'" in move2 else 2)
-                total_turns = (turns1 + turns2) % 4
-                
-                if total_turns == 0:
-                    i += 2
+        for move in self.solution:
+            face = move[0]
+            j = len(optimized) - 1
+            if j >= 0 and optimized[j][0] == OPPOSITE[face]:
+                j -= 1
+            
+            if j >= 0 and optimized[j][0] == face:
+                total_turns = (MOVE_TURNS[optimized[j]] + MOVE_TURNS[move]) % 4
+                if total_turns:
+                    optimized[j] = face + TURNS_TO_SUFFIX[total_turns]
                 else:
-                    face = move1[0]
-                    if total_turns == 1:
-                        optimized.append(face)
-                    elif total_turns == 2:
-                        optimized.append(face + "2")
-                    else:
-                        optimized.append(face + "'")
-                    i += 2
+                    del optimized[j]
             else:
-                optimized.append(self.solution[i])
-                i += 1
+                optimized.append(move)
                 
         return optimized
 
     def _find_edge(self, color1, color2):
         """Finds the position of an edge piece with the given colors."""
-        edges = [
-            ('U', 0, 1, 'B', 0, 1), ('U', 1, 0, 'L', 0, 1),
-            ('U', 1, 2, 'R', 0, 1), ('U', 2, 1, 'F', 0, 1),
-            ('F', 1, 0, 'L', 1, 2), ('F', 1, 2, 'R', 1, 0),
-            ('F', 2, 1, 'D', 0, 1), ('B', 1, 0, 'R', 1, 2),
-            ('B', 1, 2, 'L', 1, 0), ('B', 2, 1, 'D', 2, 1),
-            ('D', 1, 0, 'L', 2, 1), ('D', 1, 2, 'R', 2, 1)
-        ]
-        
-        for edge in edges:
-            f1, r1, c1, f2, r2, c2 = edge
-            if {self.cube[f1][r1][c1], self.cube[f2][r2][c2]} == {color1, color2}:
-                return edge
-        return None
+        try:
+            return EDGE_SLOTS[self._edge_keys.index((1 << color1) | (1 << color2))]
+        except ValueError:
+            return None
 
     def _solve_white_cross(self):
         """Stage 1: Solves the white cross on the U face."""
         for face in ['F', 'R', 'B', 'L']:
+            # Skip if edge is already in correct position
+            slot = CROSS_SLOTS[face]
+            if self._edge_keys[slot] == self._edge_home[slot]:
+                continue
+            
             side_color = self.face_colors[face]
             edge = self._find_edge(self.white_color, side_color)
             
@@ -206,34 +394,25 @@ class CubeSolver:
                 
             f1, r1, c1, f2, r2, c2 = edge
             
-            # Skip if edge is already in correct position and oriented
-            if ((f1 == 'U' and 
-                 ((face == 'F' and r1 == 2 and c1 == 1) or
-                  (face == 'R' and r1 == 1 and c1 == 2) or
-                  (face == 'B' and r1 == 0 and c1 == 1) or
-                  (face == 'L' and r1 == 1 and c1 == 0))) and
-                f2 == face):
-                continue
-            
             # Bring edge to bottom layer
             if f1 != 'D' and f2 != 'D':
                 if f1 == 'U':
+                    # U turns only move the edge, so follow it through U_CUBIE_PERM
+                    edge_slot = EDGE_SLOTS.index(edge)
                     for _ in range(4):
-                        if (f1 == 'U' and r1 == 2 and c1 == 1 and f2 == 'F'):
+                        if edge_slot == CROSS_SLOTS['F']:
                             break
-                        self._apply(['U'])
-                        edge = self._find_edge(self.white_color, side_color)
-                        if not edge: break
-                        f1, r1, c1, f2, r2, c2 = edge
+                        self._apply1('U')
+                        edge_slot = U_CUBIE_PERM[edge_slot]
                     
                     if face == 'F':
-                        self._apply(['F'])
+                        self._apply1('F')
                     elif face == 'R':
-                        self._apply(['R'])
+                        self._apply1('R')
                     elif face == 'B':
-                        self._apply(['B'])
+                        self._apply1('B')
                     else:
-                        self._apply(['L'])
+                        self._apply1('L')
                 else:
                     if f1 == 'F' and r1 == 1 and c1 == 2:
                         self._apply(['R', 'U', 'R\''])
@@ -253,7 +432,7 @@ class CubeSolver:
                 for _ in range(4):
                     if f2 == face:
                         break
-                    self._apply(['D'])
+                    self._apply1('D')
                     edge = self._find_edge(self.white_color, side_color)
                     if not edge: break
                     f1, r1, c1, f2, r2, c2 = edge
@@ -265,24 +444,16 @@ class CubeSolver:
 
     def _find_corner(self, color1, color2, color3):
         """Finds the position of a corner piece with the given colors."""
-        corners = [
-            ('U', 0, 0, 'L', 0, 0, 'B', 0, 2), ('U', 0, 2, 'B', 0, 0, 'R', 0, 2),
-            ('U', 2, 0, 'F', 0, 0, 'L', 0, 2), ('U', 2, 2, 'R', 0, 0, 'F', 0, 2),
-            ('D', 0, 0, 'L', 2, 2, 'F', 2, 0), ('D', 0, 2, 'F', 2, 2, 'R', 2, 0),
-            ('D', 2, 0, 'B', 2, 2, 'L', 2, 0), ('D', 2, 2, 'R', 2, 2, 'B', 2, 0)
-        ]
-        
-        for corner in corners:
-            f1, r1, c1, f2, r2, c2, f3, r3, c3 = corner
-            if {self.cube[f1][r1][c1], self.cube[f2][r2][c2], self.cube[f3][r3][c3]} == {color1, color2, color3}:
-                return corner
-        return None
+        try:
+            return CORNER_SLOTS[self._corner_keys.index((1 << color1) | (1 << color2) | (1 << color3))]
+        except ValueError:
+            return None
 
     def _solve_white_corners(self):
         """Stage 2: Solves the four white corners."""
         for face in ['F', 'R', 'B', 'L']:
             side_color1 = self.face_colors[face]
-            side_color2 = self.face_colors['L' if face == 'F' else 'F' if face == 'R' else 'R' if face == 'B' else 'B']
+            side_color2 = self.face_colors[NEIGHBOR_CCW[face]]
             
             corner = self._find_corner(self.white_color, side_color1, side_color2)
             
@@ -297,12 +468,12 @@ class CubeSolver:
                 for _ in range(4):
                     if (f1 == 'U' and r1 == 2 and c1 == 2 and f2 == 'R' and f3 == 'F'):
                         break
-                    self._apply(['U'])
+                    self._apply1('U')
                     corner = self._find_corner(self.white_color, side_color1, side_color2)
                     if not corner: break
                     f1, r1, c1, f2, r2, c2, f3, r3, c3 = corner
                 
-                self._apply(['R', 'D', 'R\'', 'D\''])
+                self._apply_alg('sexy_d')
                 corner = self._find_corner(self.white_color, side_color1, side_color2)
                 if not corner: continue
                 f1, r1, c1, f2, r2, c2, f3, r3, c3 = corner
@@ -310,11 +481,11 @@ class CubeSolver:
             # Corner is in bottom layer
             if f1 == 'D' or f2 == 'D' or f3 == 'D':
                 for _ in range(4):
-                    if (f2 == face and f3 == ('L' if face == 'F' else 'F' if face == 'R' else 'R' if face == 'B' else 'B')):
+                    if f2 == face and f3 == NEIGHBOR_CCW[face]:
                         break
-                    self._apply(['D'])
+                    self._apply1('D')
                     corner = self._find_corner(self.white_color, side_color1, side_color2)
-                    if not edge: break
+                    if not corner: break
                     f1, r1, c1, f2, r2, c2, f3, r3, c3 = corner
                 
                 if f1 == 'D':
@@ -341,7 +512,7 @@ class CubeSolver:
         for _ in range(4):
             edge = None
             for f in ['F', 'R', 'B', 'L']:
-                adj_face = 'R' if f == 'F' else 'B' if f == 'R' else 'L' if f == 'B' else 'F'
+                adj_face = NEIGHBOR_CW[f]
                 e = self._find_edge(self.face_colors[f], self.face_colors[adj_face])
                 if e and 'U' not in e[0] and 'D' not in e[0] and 'U' not in e[3] and 'D' not in e[3]:
                     continue
@@ -356,9 +527,9 @@ class CubeSolver:
             
             if 'U' not in f1 and 'D' not in f1 and 'U' not in f2 and 'D' not in f2:
                 if f1 == 'F' and r1 == 1 and c1 == 2:
-                    self._apply(['U', 'R', 'U\'', 'R\'', 'U\'', 'F\'', 'U', 'F'])
+                    self._apply_alg('insert_right')
                 elif f1 == 'F' and r1 == 1 and c1 == 0:
-                    self._apply(['U\'', 'L\'', 'U', 'L', 'U', 'F', 'U\'', 'F\''])
+                    self._apply_alg('insert_left')
                 edge = self._find_edge(self.face_colors[f], self.face_colors[adj_face])
                 if not edge: continue
                 f1, r1, c1, f2, r2, c2 = edge
@@ -367,25 +538,25 @@ class CubeSolver:
                 if 'U' in f1 or 'U' in f2:
                     face = f2 if f1 == 'U' else f1
                     for _ in range(4):
-                        if self.cube[face][0][1 if face in ['L','R'] else 1] == self.face_colors[face]:
+                        if self.cube[facelet(face, 0, 1 if face in ['L','R'] else 1)] == self.face_colors[face]:
                             break
-                        self._apply(['U'])
+                        self._apply1('U')
                         edge = self._find_edge(self.face_colors[f], self.face_colors[adj_face])
                         if not edge: break
                         f1, r1, c1, f2, r2, c2 = edge
                     
-                    other_color = self.cube[f1][r1][c1] if f1 != 'U' else self.cube[f2][r2][c2]
-                    target_face = [k for k, v in self.face_colors.items() if v == other_color][0]
+                    other_color = self.cube[facelet(f1, r1, c1)] if f1 != 'U' else self.cube[facelet(f2, r2, c2)]
+                    target_face = self.color_to_face[int(other_color)]
                     
                     if target_face == 'R':
-                        self._apply(['U', 'R', 'U\'', 'R\'', 'U\'', 'F\'', 'U', 'F'])
+                        self._apply_alg('insert_right')
                     else:
-                        self._apply(['U\'', 'L\'', 'U', 'L', 'U', 'F', 'U\'', 'F\''])
+                        self._apply_alg('insert_left')
                 else:
                     for _ in range(4):
                         if (f1 == 'F' and r1 == 2 and c1 == 1):
                             break
-                        self._apply(['D'])
+                        self._apply1('D')
                         edge = self._find_edge(self.face_colors[f], self.face_colors[adj_face])
                         if not edge: break
                         f1, r1, c1, f2, r2, c2 = edge
@@ -393,63 +564,43 @@ class CubeSolver:
 
     def _solve_yellow_cross(self):
         """Stage 4: Creates a yellow cross on the D face."""
-        edges = [
-            self.cube['D'][0][1] == self.yellow_color,
-            self.cube['D'][1][0] == self.yellow_color,
-            self.cube['D'][1][2] == self.yellow_color,
-            self.cube['D'][2][1] == self.yellow_color
-        ]
+        edges = [color == self.yellow_color for color in YELLOW_CROSS(self.cube)]
         count = sum(edges)
         
         if count == 4:
             return
         
         if count == 0:
-            self._apply(['F', 'R', 'U', 'R\'', 'U\'', 'F\''])
-            edges = [
-                self.cube['D'][0][1] == self.yellow_color,
-                self.cube['D'][1][0] == self.yellow_color,
-                self.cube['D'][1][2] == self.yellow_color,
-                self.cube['D'][2][1] == self.yellow_color
-            ]
+            self._apply_alg('oll_dot')
+            edges = [color == self.yellow_color for color in YELLOW_CROSS(self.cube)]
             count = sum(edges)
         
         if count == 2:
             if edges[0] and edges[2]:
-                self._apply(['D'])
+                self._apply1('D')
             elif not (edges[1] and edges[3]):
                 for _ in range(4):
                     if (edges[1] and edges[2]):
                         break
-                    self._apply(['D'])
-                    edges = [
-                        self.cube['D'][0][1] == self.yellow_color,
-                        self.cube['D'][1][0] == self.yellow_color,
-                        self.cube['D'][1][2] == self.yellow_color,
-                        self.cube['D'][2][1] == self.yellow_color
-                    ]
+                    self._apply1('D')
+                    edges = [color == self.yellow_color for color in YELLOW_CROSS(self.cube)]
             
-            self._apply(['F', 'U', 'R', 'U\'', 'R\'', 'F\''])
+            self._apply_alg('oll_line')
 
     def _solve_yellow_face(self):
         """Stage 5: Solves the entire yellow face."""
         for _ in range(4):
-            corners = [
-                self.cube['D'][0][0] == self.yellow_color,
-                self.cube['D'][0][2] == self.yellow_color,
-                self.cube['D'][2][0] == self.yellow_color,
-                self.cube['D'][2][2] == self.yellow_color
-            ]
+            corners = [color == self.yellow_color for color in YELLOW_CORNERS(self.cube)]
             
             if all(corners):
                 return
             
             for _ in range(4):
-                if self.cube['D'][2][2] == self.yellow_color:
+                if self.cube[facelet('D', 2, 2)] == self.yellow_color:
                     break
-                self._apply(['D'])
+                self._apply1('D')
             
-            self._apply(['R', 'U', 'R\'', 'U', 'R', 'U2', 'R\''])
+            self._apply_alg('sune')
 
     def _solve_final_layer(self):
         """Stage 6: Solves the final layer by positioning edges and corners."""
@@ -458,17 +609,14 @@ class CubeSolver:
 
     def _position_final_corners(self):
         """Positions the final layer corners correctly."""
-        alg = ['R\'', 'F', 'R\'', 'B2', 'R', 'F\'', 'R\'', 'B2', 'R2']
-        
         for _ in range(4):
             solved = True
-            for i in range(4):
-                face = ['F', 'R', 'B', 'L'][i]
-                next_face = ['R', 'B', 'L', 'F'][i]
+            for face in ['F', 'R', 'B', 'L']:
+                next_face = NEIGHBOR_CW[face]
                 corner_colors = {
-                    self.cube['U'][2 if face in ['F','R'] else 0][2 if face in ['R','B'] else 0],
-                    self.cube[face][0][2 if face in ['F','B'] else 0],
-                    self.cube[next_face][0][0 if next_face in ['F','B'] else 2]
+                    self.cube[facelet('U', 2 if face in ['F','R'] else 0, 2 if face in ['R','B'] else 0)],
+                    self.cube[facelet(face, 0, 2 if face in ['F','B'] else 0)],
+                    self.cube[facelet(next_face, 0, 0 if next_face in ['F','B'] else 2)]
                 }
                 expected_colors = {self.face_colors['U'], self.face_colors[face], self.face_colors[next_face]}
                 if corner_colors != expected_colors:
@@ -478,28 +626,66 @@ class CubeSolver:
             if solved:
                 return
             
-            self._apply(alg)
-            self._apply(['U'])
+            self._apply_alg('pll_a')
+            self._apply1('U')
 
     def _position_final_edges(self):
         """Positions the final layer edges correctly."""
-        alg = ['R2', 'U', 'R', 'U', 'R\'', 'U\'', 'R\'', 'U\'', 'R\'', 'U', 'R\'']
-        
         for _ in range(4):
             solved = True
             for face in ['F', 'R', 'B', 'L']:
-                if self.cube[face][0][1] != self.face_colors[face]:
+                if self.cube[facelet(face, 0, 1)] != self.face_colors[face]:
                     solved = False
                     break
             
             if solved:
                 return
             
-            self._apply(alg)
-            self._apply(['U'])
+            self._apply_alg('pll_u')
+            self._apply1('U')
+
+def solve_lbl(cube):
+    """Solves a flat cube with the layer-by-layer CubeSolver."""
+    return CubeSolver(cube).solve()
+
+# Solvers selectable through the 'method' field of a /solve request.
+SOLVERS = {
+    'twophase': twophase.solve,
+    'optimal': optimal.solve,
+    'lbl': solve_lbl,
+}
+DEFAULT_SOLVER = 'twophase'
+
+# Map the two-phase tables at startup so default requests never pay for
+# loading them. The optimal solver's larger databases are mapped by the
+# first request that asks for it.
+twophase.get_tables()
+
+@functools.lru_cache(maxsize=65536)
+def solve_cached(method, key):
+    """Solves a packed cube with the given method, remembering recent answers.
+
+    A search that runs out of time is remembered too, as its error message,
+    so asking again for the same cube fails at once instead of spending
+    another full timeout.
+    """
+    try:
+        return tuple(SOLVERS[method](unpack_cube(key)))
+    except TimeoutError as e:
+        return str(e)
 
 # --- FLASK ENDPOINTS ---
 
+# Bodies of the fixed replies, serialized once. Each request still gets its
+# own Response, since Flask and extensions may modify it on the way out.
+with app.app_context():
+    SOLVED_BODY = jsonify({'solution': [], 'sequence': "Cube is already solved!"}).get_data()
+    NO_CUBE_BODY = jsonify({'error': 'Invalid request, no cube data provided.'}).get_data()
+
+def json_body_response(body, status=200):
+    """Wraps a pre-serialized JSON body in a new response."""
+    return app.response_class(body, status=status, mimetype=app.json.mimetype)
+
 @app.route('/')
 def home():
     return render_template('index.html')
@@ -507,22 +693,28 @@ def home():
 @app.route('/solve', methods=['POST'])
 def solve_route():
     data = request.get_json()
-    if not data or 'cube' not in data:
-        return jsonify({'error': 'Invalid request, no cube data provided.'}), 400
+    if not isinstance(data, dict) or 'cube' not in data:
+        return json_body_response(NO_CUBE_BODY, 400)
     
     cube_state = data['cube']
+    method = data.get('method', DEFAULT_SOLVER)
+    if not isinstance(method, str) or method not in SOLVERS:
+        return jsonify({'error': f"Unknown solving method: {method}"}), 400
     app.logger.info("Received cube state for solving.")
     
     try:
         validate_cube(cube_state)
-        if is_cube_solved(cube_state):
-            return jsonify({'solution': [], 'sequence': "Cube is already solved!"})
+        flat = stickers_to_flat(cube_state)
+        if is_cube_solved(flat):
+            return json_body_response(SOLVED_BODY)
         
-        solver = CubeSolver(cube_state)
-        solution_moves = solver.solve()
+        solution_moves = solve_cached(method, pack_cube(flat))
+        if isinstance(solution_moves, str):
+            raise TimeoutError(solution_moves)
+        if not solution_moves:
+            return json_body_response(SOLVED_BODY)
         
-        sequence = ' '.join(solution_moves) if solution_moves else "Cube is already solved!"
-        return jsonify({'solution': solution_moves, 'sequence': sequence})
+        return jsonify({'solution': list(solution_moves), 'sequence': ' '.join(solution_moves)})
     except Exception as e:
         app.logger.error(f"Solver error: {e}", exc_info=True)
         return jsonify({'error': f"An error occurred: {str(e)}"}), 400
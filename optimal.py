@@ -0,0 +1,145 @@
+"""Optimal solver: IDA* with pattern-database heuristics.
+
+Each pattern database holds the exact distance from solved for one
+projection of the cube, so the largest of them never overestimates and
+IDA* returns a shortest solution. These are the databases of Korf's
+solver, on coordinates whose move tables are valid for all 18 moves:
+
+* the full corner database, corner permutation x corner twist
+  (8! * 3^7 entries);
+* two edge databases, for the slots and flips of edges 0-5 and of edges
+  6-11 (12!/6! * 2^6 entries each);
+* corner twist x E-slice position, edge flip x E-slice position and
+  corner permutation x E-slice position, which are small and still prune
+  some moves the others let through.
+
+All of them are built once and memory-mapped through twophase.load_table
+on the first call to solve(). A node is solved once every database reads
+zero, since the corner and edge databases together cover every piece.
+Even so, a pure Python search only proves optimality within seconds for
+cubes about 13 moves from solved, so solve() gives up after a short
+timeout rather than holding a worker on a hopeless search.
+"""
+import functools
+import time
+
+import numpy as np
+
+import twophase
+from twophase import MOVE_NAMES, N_CORNERS, N_EDGE6, N_EDGE6_SLOTS, N_SLICE, N_TWIST, PHASE1_NEXT
+
+# The two halves of the edges that the edge databases track.
+EDGE_HALVES = (range(6), range(6, 12))
+
+
+class Tables:
+    """The pattern databases and the edge move table they share."""
+
+    def __init__(self):
+        tables = twophase.get_tables()
+        self.corners_slice_prune = memoryview(twophase.load_table(
+            'corners_eslice_prune', np.uint8, N_CORNERS * N_SLICE,
+            lambda: twophase.pruning_table(tables.corners_move, tables.slice_move, range(18))))
+        self.corner_cubies_prune = memoryview(twophase.load_table(
+            'corner_cubies_prune', np.uint8, N_CORNERS * N_TWIST,
+            lambda: twophase.pruning_table(tables.corners_move, tables.twist_move, range(18))))
+        edge6_move = twophase.load_table(
+            'edge6_move', np.uint32, N_EDGE6_SLOTS * 18, twophase.edge6_move_table).reshape(N_EDGE6_SLOTS, 18)
+        self.edge6_move = memoryview(edge6_move).cast('B').cast('I')
+        self.edges_prunes = [
+            memoryview(twophase.load_table(
+                f'edges{half.start}_prune', np.uint8, N_EDGE6,
+                lambda half=half: twophase.edge6_pruning_table(edge6_move, half)))
+            for half in EDGE_HALVES
+        ]
+
+
+@functools.lru_cache(maxsize=None)
+def get_tables():
+    """Maps the databases on first use and shares them afterwards."""
+    return Tables()
+
+
+class _Search:
+    """One iterative-deepening search for a shortest solution."""
+
+    def __init__(self, tables, cubie, deadline):
+        flat = twophase.get_tables().flat
+        self.twist_move, self.flip_move, self.slice_move, self.corners_move = flat[:4]
+        self.twist_slice_prune, self.flip_slice_prune = flat[6:8]
+        self.corners_slice_prune = tables.corners_slice_prune
+        self.corner_cubies_prune = tables.corner_cubies_prune
+        self.edge6_move = tables.edge6_move
+        self.edges_low_prune, self.edges_high_prune = tables.edges_prunes
+        self.cubie = cubie
+        self.deadline = deadline
+        self.moves = []
+
+    def bound(self, twist, flip, slice_, corners, low, high):
+        """Largest database distance, a lower bound on the moves left."""
+        return max(self.twist_slice_prune[twist * N_SLICE + slice_],
+                   self.flip_slice_prune[flip * N_SLICE + slice_],
+                   self.corners_slice_prune[corners * N_SLICE + slice_],
+                   self.corner_cubies_prune[corners * N_TWIST + twist],
+                   self.edges_low_prune[low], self.edges_high_prune[high])
+
+    def run(self, max_depth):
+        cp, co, ep, eo = self.cubie
+        coords = (twophase.twist_coord(co), twophase.flip_coord(eo),
+                  twophase.slice_coord(ep), twophase.corners_coord(cp),
+                  *(twophase.edge6_coord(ep, eo, half) for half in EDGE_HALVES))
+        for depth in range(self.bound(*coords), max_depth + 1):
+            if self._search(*coords, depth, -1):
+                return self.moves
+        return None
+
+    def _search(self, twist, flip, slice_, corners, low, high, togo, last):
+        # Every database reads zero here, so the cube is solved.
+        if togo == 0:
+            return True
+        if time.monotonic() > self.deadline:
+            raise TimeoutError("Optimal search ran out of time; try the two-phase solver")
+        twist, flip, slice_, corners = twist * 18, flip * 18, slice_ * 18, corners * 18
+        low_slots, low_flips = (low >> 6) * 18, low & 63
+        high_slots, high_flips = (high >> 6) * 18, high & 63
+        # Strongest database first, so most moves are cut after one lookup.
+        for m in PHASE1_NEXT[last]:
+            t = self.twist_move[twist + m]
+            c = self.corners_move[corners + m]
+            if self.corner_cubies_prune[c * N_TWIST + t] >= togo:
+                continue
+            lo = self.edge6_move[low_slots + m] ^ low_flips
+            if self.edges_low_prune[lo] >= togo:
+                continue
+            hi = self.edge6_move[high_slots + m] ^ high_flips
+            if self.edges_high_prune[hi] >= togo:
+                continue
+            s = self.slice_move[slice_ + m]
+            if self.twist_slice_prune[t * N_SLICE + s] >= togo:
+                continue
+            if self.corners_slice_prune[c * N_SLICE + s] >= togo:
+                continue
+            f = self.flip_move[flip + m]
+            if self.flip_slice_prune[f * N_SLICE + s] >= togo:
+                continue
+            self.moves.append(m)
+            if self._search(t, f, s, c, lo, hi, togo - 1, m):
+                return True
+            self.moves.pop()
+        return False
+
+
+def solve(flat, max_depth=20, timeout=2.0):
+    """Returns a shortest list of move names solving a flat cube.
+
+    Raises ValueError if no solution has at most max_depth moves, and
+    TimeoutError if the search takes longer than timeout seconds.
+    """
+    cubie = twophase.to_cubie(flat)
+    # The first call maps the databases, which must not count against the timeout.
+    tables = get_tables()
+    search = _Search(tables, cubie, time.monotonic() + timeout)
+    solution = search.run(max_depth)
+    if solution is None:
+        raise ValueError(f"No solution of at most {max_depth} moves exists")
+    return [MOVE_NAMES[m] for m in solution]
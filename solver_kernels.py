@@ -0,0 +1,29 @@
+"""Inner-loop kernels for the flat cube, JIT-compiled with Numba when available.
+
+Numba is optional. Without it the same functions fall back to vectorized
+NumPy, so callers never need to know which implementation they got. Only
+scalar loops that beat NumPy once compiled live here; a plain fancy-index
+gather like cube[perm] is already faster than a Numba call.
+"""
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+HAVE_NUMBA = njit is not None
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def is_solved(cube):
+        """Checks that every face matches its center sticker."""
+        for face in range(6):
+            center = cube[9 * face + 4]
+            for i in range(9 * face, 9 * face + 9):
+                if cube[i] != center:
+                    return False
+        return True
+else:
+    def is_solved(cube):
+        """Checks that every face matches its center sticker."""
+        faces = cube.reshape(6, 9)
+        return bool((faces == faces[:, 4:5]).all())
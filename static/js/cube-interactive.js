@@ -3,6 +3,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const STICKER_COLORS = ['W', 'R', 'G', 'Y', 'O', 'B'];
     const DEFAULT_FACE_COLORS = { U: 'W', R: 'R', F: 'G', D: 'Y', L: 'O', B: 'B' };
     const FACE_ORDER = ['U', 'L', 'F', 'R', 'B', 'D'];
+    const SOLVER_FACE_ORDER = ['U', 'R', 'F', 'D', 'L', 'B'];
 
     const cubeElement = document.querySelector('.cube');
     const sceneElement = document.querySelector('.scene');
@@ -44,25 +45,20 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // --- Cube Validation and API Call ---
+    // The solver expects all 54 stickers as one flat list, face by face in
+    // U, R, F, D, L, B order, each face read row by row.
     function getCubeState() {
-        const cube = {};
-        FACE_ORDER.forEach(face => {
+        return SOLVER_FACE_ORDER.flatMap(face => {
             const grid = document.querySelector(`.grid[data-face="${face}"]`);
-            const stickers = [...grid.children].map(s => s.dataset.value);
-            cube[face] = [stickers.slice(0, 3), stickers.slice(3, 6), stickers.slice(6, 9)];
+            return [...grid.children].map(s => s.dataset.value);
         });
-        return cube;
     }
 
     function isValidCube(cube) {
         const counts = STICKER_COLORS.reduce((acc, color) => ({ ...acc, [color]: 0 }), {});
-        for (const face of Object.values(cube)) {
-            for (const row of face) {
-                for (const color of row) {
-                    if (counts[color] !== undefined) {
-                        counts[color]++;
-                    }
-                }
+        for (const color of cube) {
+            if (counts[color] !== undefined) {
+                counts[color]++;
             }
         }
         return Object.values(counts).every(count => count === 9);
@@ -87,11 +83,12 @@ document.addEventListener('DOMContentLoaded', () => {
                 body: JSON.stringify({ cube: cubeState })
             });
 
-            if (!response.ok) {
+            // Error replies carry their reason in the JSON body, so read it first.
+            const result = await response.json().catch(() => ({}));
+            if (!response.ok && !result.error) {
                 throw new Error(`Server responded with status: ${response.status}`);
             }
 
-            const result = await response.json();
             if (result.error) {
                 outputElement.textContent = `Error: ${result.error}`;
             } else if (result.solution && result.solution.length > 0) {
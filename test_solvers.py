@@ -0,0 +1,112 @@
+"""Tests for the two-phase, optimal and layer-by-layer solvers.
+
+Run with python -m pytest or python -m unittest. A first run builds any
+missing solver tables under tables/.
+"""
+import itertools
+import random
+import time
+import unittest
+
+import numpy as np
+
+import app
+import optimal
+import twophase
+
+SOLVED = (np.arange(54) // 9).astype(np.uint8)
+
+
+def scrambled(moves):
+    """Returns the flat cube reached by applying moves to a solved cube."""
+    return SOLVED[app.compose(tuple(moves))]
+
+
+def random_moves(rng, n):
+    return [rng.choice(list(app.PERMS)) for _ in range(n)]
+
+
+class TwoPhaseTest(unittest.TestCase):
+
+    def test_solves_random_scrambles(self):
+        rng = random.Random(1)
+        max_length, timeout = 22, 5.0
+        for _ in range(20):
+            cube = scrambled(random_moves(rng, 30))
+            start = time.monotonic()
+            solution = twophase.solve(cube, max_length, timeout)
+            elapsed = time.monotonic() - start
+            self.assertTrue(app.is_cube_solved(cube[app.compose(tuple(solution))]))
+            if len(solution) > max_length:
+                self.assertGreaterEqual(elapsed, timeout)
+
+    def test_rejects_twisted_corner(self):
+        cube = SOLVED.copy()
+        a, b, c = twophase.CORNER_FACELETS[0]
+        cube[[a, b, c]] = cube[[b, c, a]]
+        with self.assertRaisesRegex(ValueError, "twisted"):
+            twophase.to_cubie(cube)
+
+    def test_rejects_flipped_edge(self):
+        cube = SOLVED.copy()
+        a, b = twophase.EDGE_FACELETS[0]
+        cube[[a, b]] = cube[[b, a]]
+        with self.assertRaisesRegex(ValueError, "flipped"):
+            twophase.to_cubie(cube)
+
+    def test_rejects_swapped_edges(self):
+        cube = SOLVED.copy()
+        first, second = twophase.EDGE_FACELETS[0], twophase.EDGE_FACELETS[1]
+        cube[list(first + second)] = cube[list(second + first)]
+        with self.assertRaisesRegex(ValueError, "swapped"):
+            twophase.to_cubie(cube)
+
+    def test_perm_rank_matches_perm_coords(self):
+        perms = np.array(list(itertools.permutations(range(8))), dtype=np.int64)
+        ranks = [twophase._perm_rank(perm) for perm in perms.tolist()]
+        self.assertEqual(ranks, twophase._perm_coords(perms).tolist())
+
+
+class OptimalTest(unittest.TestCase):
+
+    def test_known_lengths(self):
+        cases = [
+            ("R", 1),
+            ("R U", 2),
+            ("R U R' U'", 4),
+            ("R U R' U R U2 R'", 7),
+            ("U2 D2 F2 B2 L2 R2", 6),
+        ]
+        for moves, length in cases:
+            cube = scrambled(moves.split())
+            solution = optimal.solve(cube, timeout=60.0)
+            self.assertEqual(len(solution), length, moves)
+            self.assertTrue(app.is_cube_solved(cube[app.compose(tuple(solution))]))
+
+    def test_never_longer_than_scramble(self):
+        rng = random.Random(2)
+        for _ in range(10):
+            moves = random_moves(rng, 8)
+            solution = optimal.solve(scrambled(moves), timeout=60.0)
+            self.assertLessEqual(len(solution), len(moves))
+
+
+class CubeSolverTest(unittest.TestCase):
+
+    def test_optimize_solution_keeps_cube_state(self):
+        rng = random.Random(3)
+        solver = app.CubeSolver(scrambled(random_moves(rng, 20)))
+        cube = np.array(solver.cube, dtype=np.uint8)
+        for _ in range(200):
+            # Few faces, so cancellations across opposite faces are common.
+            solver.solution = [rng.choice(['R', "R'", 'R2', 'L', "L'", 'L2', 'U'])
+                               for _ in range(rng.randrange(12))]
+            optimized = solver._optimize_solution()
+            self.assertLessEqual(len(optimized), len(solver.solution))
+            np.testing.assert_array_equal(cube[app.compose(tuple(optimized))],
+                                          cube[app.compose(tuple(solver.solution))])
+        np.testing.assert_array_equal(np.array(solver.cube, dtype=np.uint8), cube)
+
+
+if __name__ == '__main__':
+    unittest.main()
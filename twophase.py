@@ -0,0 +1,569 @@
+"""Kociemba two-phase solver for the flat cube.
+
+Phase 1 brings the cube into the subgroup <U, D, R2, F2, L2, B2>, where
+every corner and edge is oriented and the four E-slice edges sit in the
+slice. Phase 2 solves the rest using only those moves. Both phases are
+IDA* searches over small integer coordinates, guided by pruning tables
+that hold the exact distance to the phase goal for a pair of coordinates.
+
+The input is a flat cube as used by app.py: 54 stickers in URFDLB face
+order, each holding the index of the face whose center shares its color.
+"""
+import functools
+import glob
+import hashlib
+import inspect
+import itertools
+import logging
+import math
+import os
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Face order of the flat cube and of the coordinate move tables.
+U, R, F, D, L, B = range(6)
+MOVE_NAMES = [face + suffix for face in 'URFDLB' for suffix in ('', '2', "'")]
+# Moves that keep a cube inside the phase 2 subgroup.
+PHASE2_MOVES = [MOVE_NAMES.index(m) for m in ('U', 'U2', "U'", 'R2', 'F2', 'D', 'D2', "D'", 'L2', 'B2')]
+
+# Corner slots URF, UFL, ULB, UBR, DFR, DLF, DBL, DRB and edge slots
+# UR, UF, UL, UB, DR, DF, DL, DB, FR, FL, BL, BR as flat sticker indices,
+# starting from the U/D sticker (or the F/B sticker for slice edges).
+CORNER_FACELETS = [
+    (8, 9, 20), (6, 18, 38), (0, 36, 47), (2, 45, 11),
+    (29, 26, 15), (27, 44, 24), (33, 53, 42), (35, 17, 51)
+]
+EDGE_FACELETS = [
+    (5, 10), (7, 19), (3, 37), (1, 46), (32, 16), (28, 25),
+    (30, 43), (34, 52), (23, 12), (21, 41), (50, 39), (48, 14)
+]
+CORNER_COLORS = [
+    (U, R, F), (U, F, L), (U, L, B), (U, B, R),
+    (D, F, R), (D, L, F), (D, B, L), (D, R, B)
+]
+EDGE_COLORS = [
+    (U, R), (U, F), (U, L), (U, B), (D, R), (D, F),
+    (D, L), (D, B), (F, R), (F, L), (B, L), (B, R)
+]
+
+# Quarter turns as (corner perm, corner twist, edge perm, edge flip): slot i
+# receives the piece from slot perm[i].
+BASIC_MOVES = [
+    ([3, 0, 1, 2, 4, 5, 6, 7], [0] * 8,
+     [3, 0, 1, 2, 4, 5, 6, 7, 8, 9, 10, 11], [0] * 12),
+    ([4, 1, 2, 0, 7, 5, 6, 3], [2, 0, 0, 1, 1, 0, 0, 2],
+     [8, 1, 2, 3, 11, 5, 6, 7, 4, 9, 10, 0], [0] * 12),
+    ([1, 5, 2, 3, 0, 4, 6, 7], [1, 2, 0, 0, 2, 1, 0, 0],
+     [0, 9, 2, 3, 4, 8, 6, 7, 1, 5, 10, 11], [0, 1, 0, 0, 0, 1, 0, 0, 1, 1, 0, 0]),
+    ([0, 1, 2, 3, 5, 6, 7, 4], [0] * 8,
+     [0, 1, 2, 3, 5, 6, 7, 4, 8, 9, 10, 11], [0] * 12),
+    ([0, 2, 6, 3, 4, 1, 5, 7], [0, 1, 2, 0, 0, 2, 1, 0],
+     [0, 1, 10, 3, 4, 5, 9, 7, 8, 2, 6, 11], [0] * 12),
+    ([0, 1, 3, 7, 4, 5, 2, 6], [0, 0, 1, 2, 0, 0, 2, 1],
+     [0, 1, 2, 11, 4, 5, 6, 10, 8, 9, 3, 7], [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 1]),
+]
+
+N_TWIST = 2187     # 3^7 corner orientations
+N_FLIP = 2048      # 2^11 edge orientations
+N_SLICE = 495      # C(12, 4) positions of the E-slice edges
+N_CORNERS = 40320  # 8! corner permutations
+N_UD_EDGES = 40320 # 8! permutations of the U and D layer edges
+N_SLICE_PERM = 24  # 4! permutations of the E-slice edges
+N_EDGE6_SLOTS = 665280         # 12!/6! slots for six chosen edges
+N_EDGE6 = N_EDGE6_SLOTS * 64   # times 2^6 flips of those edges
+
+
+def multiply(a, b):
+    """Returns the cubie cube for applying b after a."""
+    a_cp, a_co, a_ep, a_eo = a
+    b_cp, b_co, b_ep, b_eo = b
+    return (
+        [a_cp[p] for p in b_cp],
+        [(a_co[p] + o) % 3 for p, o in zip(b_cp, b_co)],
+        [a_ep[p] for p in b_ep],
+        [(a_eo[p] + o) % 2 for p, o in zip(b_ep, b_eo)],
+    )
+
+
+def _build_cubie_moves():
+    """Expands the quarter turns into all 18 moves in MOVE_NAMES order."""
+    moves = []
+    for quarter in BASIC_MOVES:
+        cube = quarter
+        for _ in range(3):
+            moves.append(cube)
+            cube = multiply(cube, quarter)
+    return moves
+
+CUBIE_MOVES = _build_cubie_moves()
+
+
+def to_cubie(flat):
+    """Converts a flat cube into (cp, co, ep, eo), rejecting impossible cubes."""
+    flat = [int(color) for color in flat]
+    cp, co = [], []
+    for slot in CORNER_FACELETS:
+        for ori in range(3):
+            if flat[slot[ori]] in (U, D):
+                break
+        else:
+            raise ValueError("A corner has no U or D colored sticker")
+        colors = (flat[slot[ori]], flat[slot[(ori + 1) % 3]], flat[slot[(ori + 2) % 3]])
+        if colors not in CORNER_COLORS:
+            raise ValueError("A corner has an impossible color combination")
+        cp.append(CORNER_COLORS.index(colors))
+        co.append(ori)
+    ep, eo = [], []
+    for a, b in EDGE_FACELETS:
+        colors = (flat[a], flat[b])
+        if colors in EDGE_COLORS:
+            ep.append(EDGE_COLORS.index(colors))
+            eo.append(0)
+        elif colors[::-1] in EDGE_COLORS:
+            ep.append(EDGE_COLORS.index(colors[::-1]))
+            eo.append(1)
+        else:
+            raise ValueError("An edge has an impossible color combination")
+    if len(set(cp)) != 8 or len(set(ep)) != 12:
+        raise ValueError("Some corners or edges appear more than once")
+    if sum(co) % 3:
+        raise ValueError("A corner is twisted")
+    if sum(eo) % 2:
+        raise ValueError("An edge is flipped")
+    if _parity(cp) != _parity(ep):
+        raise ValueError("Two pieces are swapped")
+    return cp, co, ep, eo
+
+
+def _parity(perm):
+    """Returns the parity (0 or 1) of a permutation."""
+    return sum(perm[i] > perm[j] for i in range(len(perm)) for j in range(i)) % 2
+
+
+# --- COORDINATES ---
+# The vectorised rankers build the tables; the searches rank single cubes
+# with the plain Python ones, which avoid many tiny NumPy calls per solve.
+
+def _perm_coords(perms):
+    """Ranks each row of a (n, k) permutation array; the identity ranks 0."""
+    coords = np.zeros(len(perms), dtype=np.int64)
+    for i in range(1, perms.shape[1]):
+        coords += (perms[:, :i] > perms[:, i:i + 1]).sum(axis=1) * math.factorial(i)
+    return coords
+
+
+def _orientation_coords(orients, base):
+    """Ranks orientation rows by all but their last, dependent, entry."""
+    coords = np.zeros(len(orients), dtype=np.int64)
+    for i in range(orients.shape[1] - 1):
+        coords = coords * base + orients[:, i]
+    return coords
+
+
+def _perm_rank(perm):
+    """Ranks one permutation like _perm_coords, with plain Python loops."""
+    coord = 0
+    for i in range(len(perm) - 1, 0, -1):
+        x, higher = perm[i], 0
+        for j in range(i):
+            if perm[j] > x:
+                higher += 1
+        coord = coord * (i + 1) + higher
+    return coord
+
+
+def _orientation_rank(orients, base):
+    """Ranks one orientation vector like _orientation_coords, with plain Python loops."""
+    coord = 0
+    for i in range(len(orients) - 1):
+        coord = coord * base + orients[i]
+    return coord
+
+
+def _edge6_coords(slots):
+    """Ranks rows of six distinct edge slots in lexicographic order; 0-5 ranks 0."""
+    coords = np.zeros(len(slots), dtype=np.int64)
+    for i in range(6):
+        smaller = (slots[:, :i] < slots[:, i:i + 1]).sum(axis=1)
+        coords = coords * (12 - i) + slots[:, i] - smaller
+    return coords
+
+
+def _all_orientations(n, base):
+    """Lists every orientation vector with a sum divisible by base, by rank."""
+    free = np.array(list(itertools.product(range(base), repeat=n - 1)), dtype=np.int64)
+    last = (-free.sum(axis=1)) % base
+    return np.hstack([free, last[:, None]])
+
+
+def _slice_coord(occupied):
+    """Ranks the set of slots holding E-slice edges; slots 8-11 rank 0."""
+    coord, x = 0, 0
+    for j in range(11, -1, -1):
+        if occupied[j]:
+            coord += math.comb(11 - j, x + 1)
+            x += 1
+    return coord
+
+
+def twist_coord(co):
+    """Corner orientation coordinate, 0 to 2186."""
+    return _orientation_rank(co, 3)
+
+
+def flip_coord(eo):
+    """Edge orientation coordinate, 0 to 2047."""
+    return _orientation_rank(eo, 2)
+
+
+def slice_coord(ep):
+    """E-slice edge position coordinate, 0 to 494."""
+    return _slice_coord([p >= 8 for p in ep])
+
+
+def corners_coord(cp):
+    """Corner permutation coordinate, 0 to 40319."""
+    return _perm_rank(cp)
+
+
+def ud_edges_coord(ep):
+    """U and D layer edge permutation coordinate for phase 2, 0 to 40319."""
+    return _perm_rank(ep[:8])
+
+
+def slice_perm_coord(ep):
+    """E-slice edge permutation coordinate for phase 2, 0 to 23."""
+    return _perm_rank(ep[8:])
+
+
+def edge6_coord(ep, eo, pieces):
+    """Slot and flip coordinate of six edges, 0 to 42577919, ranked like _edge6_coords."""
+    slots = [ep.index(p) for p in pieces]
+    coord, flips = 0, 0
+    for i, slot in enumerate(slots):
+        smaller = 0
+        for j in range(i):
+            if slots[j] < slot:
+                smaller += 1
+        coord = coord * (12 - i) + slot - smaller
+        flips |= eo[slot] << i
+    return coord * 64 + flips
+
+
+# --- TABLES ---
+
+def _orientation_move_table(n, base, perm_index, orient_index):
+    """Move table for the twist (corners) or flip (edges) coordinate."""
+    orients = _all_orientations(n, base)
+    table = np.empty((len(orients), 18), dtype=np.int64)
+    for m, move in enumerate(CUBIE_MOVES):
+        perm, twist = np.array(move[perm_index]), np.array(move[orient_index])
+        table[:, m] = _orientation_coords((orients[:, perm] + twist) % base, base)
+    return table
+
+
+def _perm_move_table(n, perm_index, moves, offset=0):
+    """Move table for a permutation coordinate over the given move indices."""
+    perms = np.array(list(itertools.permutations(range(n))), dtype=np.int64)
+    order = np.argsort(_perm_coords(perms))
+    perms = perms[order]
+    table = np.zeros((len(perms), 18), dtype=np.int64)
+    for m in moves:
+        perm = np.array(CUBIE_MOVES[m][perm_index][offset:offset + n]) - offset
+        table[:, m] = _perm_coords(perms[:, perm])
+    return table
+
+
+def _slice_move_table():
+    """Move table for the E-slice position coordinate."""
+    table = np.empty((N_SLICE, 18), dtype=np.int64)
+    for slots in itertools.combinations(range(12), 4):
+        occupied = [j in slots for j in range(12)]
+        coord = _slice_coord(occupied)
+        for m, move in enumerate(CUBIE_MOVES):
+            table[coord, m] = _slice_coord([occupied[p] for p in move[2]])
+    return table
+
+
+def edge6_move_table():
+    """Move table for the edge6 coordinate, indexed by its slots part.
+
+    The flips an edge picks up depend only on the slot it leaves, so each
+    entry holds the new slots part times 64 plus the flips the move adds,
+    and entry ^ flips is the coordinate after the move.
+    """
+    # itertools lists the slot rows in lexicographic, so rank, order.
+    slots = np.array(list(itertools.permutations(range(12), 6)), dtype=np.int64)
+    table = np.empty((len(slots), 18), dtype=np.int64)
+    for m, (_, _, ep, eo) in enumerate(CUBIE_MOVES):
+        target = np.argsort(ep)
+        flips = np.array(eo)[target][slots] @ (1 << np.arange(6))
+        table[:, m] = _edge6_coords(target[slots]) * 64 + flips
+    return table
+
+
+def _distance_table(size, start, neighbours, block=1 << 22):
+    """Breadth-first distances from start, given each state's neighbours.
+
+    neighbours(states) yields one array of successors per move. Each level
+    is expanded forwards from the frontier while it is smaller than the
+    set of unvisited states, and found backwards afterwards: an unvisited
+    state belongs to the next level if some move leads into the frontier,
+    which holds because the moves are closed under inverses. States are
+    scanned in blocks, so large tables need little memory beyond dist.
+    """
+    dist = np.full(size, 255, dtype=np.uint8)
+    dist[start] = 0
+    depth, frontier, unvisited = 0, 1, size - 1
+    while frontier and unvisited:
+        forwards = frontier <= unvisited
+        for first in range(0, size, block):
+            states = np.flatnonzero(dist[first:first + block] == (depth if forwards else 255)) + first
+            if forwards:
+                for successors in neighbours(states):
+                    successors = successors[dist[successors] == 255]
+                    dist[successors] = depth + 1
+            else:
+                found = np.zeros(states.size, dtype=bool)
+                for successors in neighbours(states):
+                    found |= dist[successors] == depth
+                dist[states[found]] = depth + 1
+        depth += 1
+        frontier = int(np.count_nonzero(dist == depth))
+        unvisited -= frontier
+    return dist
+
+
+def pruning_table(move1, move2, moves):
+    """Breadth-first distances from solved over the product of two coordinates."""
+    n2 = move2.shape[0]
+
+    def neighbours(states):
+        a, b = np.divmod(states, n2)
+        for m in moves:
+            yield move1[a, m].astype(np.int64) * n2 + move2[b, m]
+
+    return _distance_table(move1.shape[0] * n2, 0, neighbours)
+
+
+def edge6_pruning_table(edge6_move, pieces):
+    """Breadth-first distances over the edge6 coordinate of the given pieces."""
+    solved = list(range(12))
+
+    def neighbours(states):
+        a, flips = np.divmod(states, 64)
+        for m in range(18):
+            yield edge6_move[a, m].astype(np.int64) ^ flips
+
+    return _distance_table(N_EDGE6, edge6_coord(solved, [0] * 12, pieces), neighbours)
+
+
+# Tables are built once, saved here, and memory-mapped read-only afterwards,
+# so every worker process shares the same physical pages.
+TABLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')
+
+# Bump when saved tables change in a way the fingerprint below cannot see.
+TABLE_VERSION = 1
+
+
+def _table_fingerprint():
+    """Hashes the move definitions and table builders the saved tables depend on."""
+    digest = hashlib.sha1(repr((TABLE_VERSION, MOVE_NAMES, PHASE2_MOVES, BASIC_MOVES)).encode())
+    for builder in (_perm_coords, _orientation_coords, _edge6_coords, _all_orientations, _slice_coord,
+                    edge6_coord, _orientation_move_table, _perm_move_table, _slice_move_table,
+                    edge6_move_table, _distance_table, pruning_table, edge6_pruning_table):
+        digest.update(inspect.getsource(builder).encode())
+    return digest.hexdigest()[:12]
+
+# Part of every table's file name, so a change to the moves or coordinates
+# rebuilds the tables instead of mapping stale ones of the same size.
+TABLE_TAG = _table_fingerprint()
+
+
+def load_table(name, dtype, size, build):
+    """Maps a saved table read-only, building and saving it first if needed."""
+    path = os.path.join(TABLES_DIR, f"{name}-{TABLE_TAG}.bin")
+    if not os.path.exists(path) or os.path.getsize(path) != size * np.dtype(dtype).itemsize:
+        logger.info("Building solver table %s...", name)
+        table = np.ascontiguousarray(build(), dtype=dtype)
+        os.makedirs(TABLES_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        table.tofile(tmp_path)
+        os.replace(tmp_path, path)
+        _remove_stale_tables(name, path)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(size,))
+
+
+def _remove_stale_tables(name, current):
+    """Deletes saved copies of a table built under another tag."""
+    for path in glob.glob(os.path.join(TABLES_DIR, f"{name}-*.bin")) + [os.path.join(TABLES_DIR, name + '.bin')]:
+        if path != current:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _load_move_table(name, n, build):
+    return load_table(name, np.uint16, n * 18, build).reshape(n, 18)
+
+
+class Tables:
+    """Coordinate move tables and pruning tables for both phases."""
+
+    def __init__(self):
+        all_moves = range(18)
+        self.twist_move = _load_move_table('twist_move', N_TWIST, lambda: _orientation_move_table(8, 3, 0, 1))
+        self.flip_move = _load_move_table('flip_move', N_FLIP, lambda: _orientation_move_table(12, 2, 2, 3))
+        self.slice_move = _load_move_table('slice_move', N_SLICE, _slice_move_table)
+        self.corners_move = _load_move_table('corners_move', N_CORNERS, lambda: _perm_move_table(8, 0, all_moves))
+        self.ud_edges_move = _load_move_table('ud_edges_move', N_UD_EDGES, lambda: _perm_move_table(8, 2, PHASE2_MOVES))
+        self.slice_perm_move = _load_move_table('slice_perm_move', N_SLICE_PERM,
+                                                lambda: _perm_move_table(4, 2, PHASE2_MOVES, offset=8))
+        self.twist_slice_prune = load_table(
+            'twist_slice_prune', np.uint8, N_TWIST * N_SLICE,
+            lambda: pruning_table(self.twist_move, self.slice_move, all_moves))
+        self.flip_slice_prune = load_table(
+            'flip_slice_prune', np.uint8, N_FLIP * N_SLICE,
+            lambda: pruning_table(self.flip_move, self.slice_move, all_moves))
+        self.corners_slice_prune = load_table(
+            'corners_slice_prune', np.uint8, N_CORNERS * N_SLICE_PERM,
+            lambda: pruning_table(self.corners_move, self.slice_perm_move, PHASE2_MOVES))
+        self.edges_slice_prune = load_table(
+            'edges_slice_prune', np.uint8, N_UD_EDGES * N_SLICE_PERM,
+            lambda: pruning_table(self.ud_edges_move, self.slice_perm_move, PHASE2_MOVES))
+
+    @functools.cached_property
+    def flat(self):
+        """Flat memoryviews of the mapped tables, which index as fast as lists."""
+        moves = [self.twist_move, self.flip_move, self.slice_move, self.corners_move,
+                 self.ud_edges_move, self.slice_perm_move]
+        prunes = [self.twist_slice_prune, self.flip_slice_prune,
+                  self.corners_slice_prune, self.edges_slice_prune]
+        return [memoryview(table).cast('B').cast('H') for table in moves] + [memoryview(table) for table in prunes]
+
+
+@functools.lru_cache(maxsize=None)
+def get_tables():
+    """Maps the tables on first use and shares them afterwards."""
+    return Tables()
+
+
+# --- SEARCH ---
+
+def _redundant(last, move):
+    """Skips turning the same face twice, and fixes the order of opposite faces."""
+    last_face, face = last // 3, move // 3
+    return face == last_face or face == last_face - 3
+
+# Moves worth trying after each last move; index -1 is the empty sequence.
+PHASE1_NEXT = [[m for m in range(18) if not _redundant(last, m)] for last in range(18)] + [list(range(18))]
+PHASE2_NEXT = [[m for m in PHASE2_MOVES if not _redundant(last, m)] for last in range(18)] + [PHASE2_MOVES]
+
+
+class _Search:
+    """One two-phase search over the flattened tables."""
+
+    def __init__(self, tables, cubie, target_length, deadline):
+        (self.twist_move, self.flip_move, self.slice_move, self.corners_move,
+         self.ud_edges_move, self.slice_perm_move, self.twist_slice_prune,
+         self.flip_slice_prune, self.corners_slice_prune, self.edges_slice_prune) = tables.flat
+        self.cubie = cubie
+        self.target_length = target_length
+        self.deadline = deadline
+        # Upper bound on the next solution; shrinks with every solution found.
+        self.max_length = 30
+        self.moves = []
+        self.best = None
+
+    def run(self):
+        cp, co, ep, eo = self.cubie
+        twist, flip, slice_ = twist_coord(co), flip_coord(eo), slice_coord(ep)
+        depth = max(self.twist_slice_prune[twist * N_SLICE + slice_],
+                    self.flip_slice_prune[flip * N_SLICE + slice_])
+        while depth <= self.max_length:
+            if self._phase1(twist, flip, slice_, depth, -1):
+                break
+            depth += 1
+        return self.best
+
+    def _phase1(self, twist, flip, slice_, togo, last):
+        """Depth-first phase 1 search; returns True to stop the whole search."""
+        if togo == 0:
+            # A phase 1 solution ending in a phase 2 move is covered by a shorter one.
+            if last in PHASE2_MOVES:
+                return False
+            return self._start_phase2()
+        if self.best is not None and time.monotonic() > self.deadline:
+            return True
+        twist, flip, slice_ = twist * 18, flip * 18, slice_ * 18
+        for m in PHASE1_NEXT[last]:
+            t = self.twist_move[twist + m]
+            s = self.slice_move[slice_ + m]
+            if self.twist_slice_prune[t * N_SLICE + s] >= togo:
+                continue
+            f = self.flip_move[flip + m]
+            if self.flip_slice_prune[f * N_SLICE + s] >= togo:
+                continue
+            self.moves.append(m)
+            stop = self._phase1(t, f, s, togo - 1, m)
+            self.moves.pop()
+            if stop:
+                return True
+        return False
+
+    def _start_phase2(self):
+        limit = self.max_length - len(self.moves)
+        if limit < 0:
+            return False
+        cube = self.cubie
+        for m in self.moves:
+            cube = multiply(cube, CUBIE_MOVES[m])
+        cp, _, ep, _ = cube
+        corners, edges, slice_perm = corners_coord(cp), ud_edges_coord(ep), slice_perm_coord(ep)
+        depth = max(self.corners_slice_prune[corners * N_SLICE_PERM + slice_perm],
+                    self.edges_slice_prune[edges * N_SLICE_PERM + slice_perm])
+        last = self.moves[-1] if self.moves else -1
+        while depth <= limit:
+            phase2 = []
+            if self._phase2(corners, edges, slice_perm, depth, last, phase2):
+                self.best = self.moves + phase2
+                # Keep looking for shorter solutions until the target or the deadline.
+                self.max_length = len(self.best) - 1
+                return len(self.best) <= self.target_length or time.monotonic() > self.deadline
+            depth += 1
+        return False
+
+    def _phase2(self, corners, edges, slice_perm, togo, last, moves):
+        """Depth-first phase 2 search, appending its moves on success."""
+        if togo == 0:
+            return True
+        corners, edges, slice_perm = corners * 18, edges * 18, slice_perm * 18
+        for m in PHASE2_NEXT[last]:
+            c = self.corners_move[corners + m]
+            s = self.slice_perm_move[slice_perm + m]
+            if self.corners_slice_prune[c * N_SLICE_PERM + s] >= togo:
+                continue
+            e = self.ud_edges_move[edges + m]
+            if self.edges_slice_prune[e * N_SLICE_PERM + s] >= togo:
+                continue
+            moves.append(m)
+            if self._phase2(c, e, s, togo - 1, m, moves):
+                return True
+            moves.pop()
+        return False
+
+
+def solve(flat, max_length=22, timeout=0.1):
+    """Returns a list of move names solving a flat cube.
+
+    The search keeps shortening its solution until it finds one of at most
+    max_length moves, or until timeout seconds have passed, and then returns
+    the shortest found so far. Raises ValueError for impossible cubes.
+    """
+    cubie = to_cubie(flat)
+    search = _Search(get_tables(), cubie, max_length, time.monotonic() + timeout)
+    return [MOVE_NAMES[m] for m in search.run()]